@@ -4,29 +4,51 @@ Benchmark script to compare stemmer output with correct answers.
 Computes accuracy and edit distance accuracy between answer.txt and output.txt.
 """
 
-def levenshtein_distance(s1, s2):
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+# Below this many lines, starting a process pool costs more than it saves
+PARALLEL_MIN_LINES = 1000
+
+
+def _levenshtein_py(s1, s2):
     """
-    Calculate the Levenshtein distance between two strings.
+    Pure-Python Levenshtein distance, used when RapidFuzz is unavailable.
     """
     if len(s1) < len(s2):
-        return levenshtein_distance(s2, s1)
+        return _levenshtein_py(s2, s1)
 
     if len(s2) == 0:
         return len(s1)
 
-    previous_row = range(len(s2) + 1)
+    previous_row = list(range(len(s2) + 1))
+    current_row = [0] * (len(s2) + 1)
     for i, c1 in enumerate(s1):
-        current_row = [i + 1]
+        current_row[0] = i + 1
         for j, c2 in enumerate(s2):
             insertions = previous_row[j + 1] + 1
             deletions = current_row[j] + 1
             substitutions = previous_row[j] + (c1 != c2)
-            current_row.append(min(insertions, deletions, substitutions))
-        previous_row = current_row
+            current_row[j + 1] = min(insertions, deletions, substitutions)
+        previous_row, current_row = current_row, previous_row
     
     return previous_row[-1]
 
 
+try:
+    from rapidfuzz.distance import Levenshtein as _lev
+    _dist = _lev.distance
+except ImportError:
+    _dist = _levenshtein_py
+
+
+def levenshtein_distance(s1, s2):
+    """
+    Calculate the Levenshtein distance between two strings.
+    """
+    return _dist(s1, s2)
+
+
 def edit_distance_accuracy(s1, s2):
     """
     Calculate edit distance accuracy between two strings.
@@ -43,13 +65,29 @@ def edit_distance_accuracy(s1, s2):
     return 1.0 - (distance / max_len)
 
 
+def edit_distances(s1_list, s2_list):
+    """
+    Compute Levenshtein distances for each pair of lines.
+    A single RapidFuzz call holds the GIL, so with RapidFuzz the pairs are mapped serially.
+    Large inputs on the pure-Python fallback are spread over a process pool.
+    """
+    if _dist is not _levenshtein_py or len(s1_list) < PARALLEL_MIN_LINES:
+        return list(map(_dist, s1_list, s2_list))
+
+    with ProcessPoolExecutor() as executor:
+        chunksize = max(1, len(s1_list) // (4 * (os.cpu_count() or 1)))
+        return list(executor.map(_dist, s1_list, s2_list, chunksize=chunksize))
+
+
 def load_file(filename):
     """
     Load lines from a file, stripping whitespace.
     """
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            return [line.strip() for line in f.readlines() if line.strip()]
+        # Read and decode the file in one pass instead of building a list of raw lines
+        with open(filename, 'rb') as f:
+            data = f.read().decode('utf-8')
+        return [line for line in map(str.strip, data.split('\n')) if line]
     except FileNotFoundError:
         print(f"Error: File {filename} not found!")
         return []
@@ -67,36 +105,31 @@ def compute_metrics(answer_file, output_file, input_file=None):
     input_words = load_file(input_file) if input_file else None
 
     min_lines = min(len(correct_answers), len(user_outputs))
+    correct_answers = correct_answers[:min_lines]
+    user_outputs = user_outputs[:min_lines]
+    originals = (input_words or [])[:min_lines]
+    originals += [""] * (min_lines - len(originals))
+
     exact_matches = 0
-    total_edit_distance_accuracy = 0.0
     correct_reduction_total = 0.0
     user_reduction_total = 0.0
-    
-    true_positives = 0 
-    false_positives = 0 
-    false_negatives = 0 
-    
-    for i in range(min_lines):
-        correct = correct_answers[i]
-        output = user_outputs[i] if i < len(user_outputs) else ""
-        original = input_words[i] if input_words and i < len(input_words) else ""
-        
-        is_exact_match = correct == output
-        if is_exact_match:
+    for correct, output, original in zip(correct_answers, user_outputs, originals):
+        if correct == output:
             exact_matches += 1
-            true_positives += 1
-        else:
-            false_positives += 1
-            false_negatives += 1
-        
-        edit_acc = edit_distance_accuracy(correct, output)
-        total_edit_distance_accuracy += edit_acc
-        
-        if original and input_words:
-            correct_reduction = ((len(original) - len(correct)) / len(original)) * 100 if len(original) > 0 else 0
-            user_reduction = ((len(original) - len(output)) / len(original)) * 100 if len(original) > 0 else 0
-            correct_reduction_total += correct_reduction
-            user_reduction_total += user_reduction
+        # Lines without an original word don't contribute to the reductions
+        if original:
+            correct_reduction_total += ((len(original) - len(correct)) / len(original)) * 100
+            user_reduction_total += ((len(original) - len(output)) / len(original)) * 100
+
+    true_positives = exact_matches
+    false_positives = min_lines - exact_matches
+    false_negatives = min_lines - exact_matches
+
+    distances = edit_distances(correct_answers, user_outputs)
+    total_edit_distance_accuracy = sum(
+        1.0 - d / max(len(correct), len(output), 1)
+        for d, correct, output in zip(distances, correct_answers, user_outputs)
+    )
     
     exact_accuracy = (exact_matches / min_lines) * 100 if min_lines > 0 else 0
     avg_edit_accuracy = (total_edit_distance_accuracy / min_lines) * 100 if min_lines > 0 else 0
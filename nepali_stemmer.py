@@ -1,8 +1,171 @@
+import functools
 import re
-from typing import Dict, List, Tuple, Set
+from typing import Dict, Iterable, List, Optional, Tuple, Set
 from collections import defaultdict
 
 
+def _myers(s1: str, s2: str) -> int:
+    """
+    Bit-parallel Levenshtein distance (Myers/Hyyrö). Each DP column of s1
+    is held as bit vectors, so every character of s2 costs a few integer
+    operations instead of len(s1) cell updates.
+    """
+    m = len(s1)
+    if m == 0:
+        return len(s2)
+    
+    # Bit i of peq[c] is set when s1[i] == c
+    peq = {}
+    for i, c in enumerate(s1):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    vp, vn = mask, 0
+    score = m
+    
+    for c in s2:
+        eq = peq.get(c, 0)
+        xv = eq | vn
+        xh = (((eq & vp) + vp) ^ vp) | eq
+        hp = vn | ~(xh | vp)
+        hn = vp & xh
+        if hp & last:
+            score += 1
+        elif hn & last:
+            score -= 1
+        hp = (hp << 1) | 1
+        hn <<= 1
+        vp = (hn | ~(xv | hp)) & mask
+        vn = hp & xv
+    
+    return score
+
+
+def _levenshtein_py(s1: str, s2: str) -> int:
+    """Pure-Python Levenshtein distance, used when RapidFuzz is unavailable."""
+    # Words fit in a machine word, where the bit-parallel version is fastest
+    if len(s1) <= 64:
+        return _myers(s1, s2)
+    
+    m, n = len(s1), len(s2)
+    
+    # Only the previous row is needed to compute the current one
+    prev = list(range(n + 1))
+    curr = [0] * (n + 1)
+    
+    for i in range(1, m + 1):
+        curr[0] = i
+        for j in range(1, n + 1):
+            if s1[i-1] == s2[j-1]:
+                curr[j] = prev[j-1]
+            else:
+                curr[j] = 1 + min(
+                    prev[j],
+                    curr[j-1],
+                    prev[j-1]
+                )
+        prev, curr = curr, prev
+    
+    return prev[n]
+
+
+def _bounded_levenshtein_py(s1: str, s2: str, k: int) -> int:
+    """
+    Levenshtein distance capped at k + 1 (Ukkonen's cutoff). Only cells
+    within k of the diagonal can stay <= k, so only that band is filled,
+    and the loop stops once a whole row exceeds k.
+    """
+    m, n = len(s1), len(s2)
+    big = k + 1
+    if abs(m - n) > k:
+        return big
+    
+    prev = [j if j <= k else big for j in range(n + 1)]
+    curr = [big] * (n + 1)
+    
+    for i in range(1, m + 1):
+        lo, hi = max(1, i - k), min(n, i + k)
+        curr[0] = i if i <= k else big
+        # Clear the cell left of the band, left over from two rows back
+        if lo > 1:
+            curr[lo-1] = big
+        row_min = curr[0]
+        for j in range(lo, hi + 1):
+            if s1[i-1] == s2[j-1]:
+                value = prev[j-1]
+            else:
+                value = 1 + min(prev[j], curr[j-1], prev[j-1])
+            if value > big:
+                value = big
+            curr[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > k:
+            return big
+        prev, curr = curr, prev
+    
+    return prev[n]
+
+
+def _load_numba_backend():
+    """
+    Compile the Numba edit distance backend and make it the default.
+    Falls back to pure Python when numba or numpy is not installed.
+    """
+    global _dist
+    try:
+        import numba
+        import numpy as np
+    except ImportError:
+        _dist = _levenshtein_py
+        return _dist
+    
+    @numba.njit(cache=True)
+    def _lev_nb(a, b):
+        m, n = a.shape[0], b.shape[0]
+        prev = np.arange(n + 1, dtype=np.int32)
+        curr = np.zeros(n + 1, dtype=np.int32)
+        for i in range(1, m + 1):
+            curr[0] = i
+            for j in range(1, n + 1):
+                if a[i-1] == b[j-1]:
+                    curr[j] = prev[j-1]
+                else:
+                    curr[j] = 1 + min(prev[j], curr[j-1], prev[j-1])
+            prev, curr = curr, prev
+        return prev[n]
+    
+    def _levenshtein_nb(s1: str, s2: str) -> int:
+        """Levenshtein distance over UTF-32 code point arrays via Numba."""
+        a = np.frombuffer(s1.encode('utf-32-le'), dtype=np.int32)
+        b = np.frombuffer(s2.encode('utf-32-le'), dtype=np.int32)
+        return int(_lev_nb(a, b))
+    
+    _dist = _levenshtein_nb
+    return _dist
+
+
+def _lazy_dist(s1: str, s2: str) -> int:
+    """Select the non-RapidFuzz backend on first use, then delegate to it."""
+    return _load_numba_backend()(s1, s2)
+
+
+# Prefer RapidFuzz's compiled implementation when it is installed, then a
+# Numba-compiled DP, then pure Python. Numba is imported and compiled only
+# on the first full edit distance, since stemming itself never needs one.
+# All backends compare code points, so Devanagari strings are passed as-is.
+try:
+    from rapidfuzz.distance import Levenshtein as _lev
+    _dist = _lev.distance
+    
+    def _bounded_dist(s1: str, s2: str, k: int) -> int:
+        return _lev.distance(s1, s2, score_cutoff=k)
+except ImportError:
+    _bounded_dist = _bounded_levenshtein_py
+    _dist = _lazy_dist
+
+
 class NepaliStemmer:
     """    
     The algorithm works in multiple stages:
@@ -26,6 +189,9 @@ class NepaliStemmer:
         # Edit distance threshold for validation
         self.edit_distance_threshold = 0.4  # 40% of word length
         
+        # Derived lookup structures, the stem cache and the specialized stemmer
+        self.build_suffix_index()
+        
     def initialize_suffix_rules(self):
         """
         Initialize Nepali suffix rules organized by morphological categories.
@@ -97,6 +263,104 @@ class NepaliStemmer:
             'दार': 2.5,
         }
     
+    def build_suffix_index(self):
+        """
+        Build the lookup structures derived from the suffix tables and reset
+        the stemming cache. Call again after modifying the suffix tables or
+        the stopwords.
+        """
+        # Sort all suffixes once by priority: weight * length
+        # (prefer longer, weighted suffixes)
+        all_suffixes = {
+            **self.case_markers,
+            **self.plural_markers,
+            **self.verbal_suffixes,
+            **self.adjectival_suffixes,
+            **self.nominal_suffixes,
+        }
+        self._sorted_suffixes = tuple(sorted(
+            ((suffix, weight, weight * len(suffix))
+             for suffix, weight in all_suffixes.items()),
+            key=lambda x: x[2],
+            reverse=True
+        ))
+        
+        # Suffix lengths indexed by priority rank, for slicing stems
+        self._suf_lens = tuple(len(entry[0]) for entry in self._sorted_suffixes)
+        
+        # Trie over reversed suffixes, so every suffix of a word can be found
+        # in one walk from its last character. The '' key marks the end of a
+        # suffix and holds its priority rank.
+        # An anchored regex alternation is not a substitute: it yields only
+        # the leftmost (longest) match, while stem() needs every match in
+        # priority order to fall back when validation fails.
+        self._rev_trie = {}
+        for rank, (suffix, _, _) in enumerate(self._sorted_suffixes):
+            node = self._rev_trie
+            for char in reversed(suffix):
+                node = node.setdefault(char, {})
+            node[''] = rank
+        
+        # Stemming function specialized for this suffix set
+        self._fast_stem = self._compile_fast_stem()
+        
+        # Memoize stems of normalized words; corpora repeat words heavily
+        self._stem_cached = functools.lru_cache(maxsize=100_000)(self._stem_normalized)
+    
+    def _compile_fast_stem(self):
+        """
+        Generate and compile a stemming function for a normalized word,
+        with the suffix trie unrolled into nested character checks. Within
+        each branch the matching suffixes are already in priority order, so
+        no lookups or sorting happen at stemming time.
+        """
+        lines = [
+            'def _fast_stem(word):',
+            '    wlen = len(word)',
+            '    # Don\'t stem very short words or stopwords',
+            '    if wlen <= 2 or word in stopwords:',
+            '        return word',
+        ]
+        
+        def emit(node, depth, ranks, indent):
+            pad = ' ' * indent
+            keyword = 'if'
+            for char, child in node.items():
+                if char == '':
+                    continue
+                # The first 3 characters always exist past the length check
+                condition = f'word[{-depth - 1}] == {char!r}'
+                if depth >= 3:
+                    condition = f'wlen > {depth} and {condition}'
+                lines.append(f'{pad}{keyword} {condition}:')
+                keyword = 'elif'
+                child_ranks = ranks + [child['']] if '' in child else ranks
+                emit(child, depth + 1, child_ranks, indent + 4)
+            # Deepest match reached: try the suffixes seen along the path
+            for rank in sorted(ranks):
+                lines.append(f'{pad}stem = candidate(word, {self._suf_lens[rank]}, wlen)')
+                lines.append(f'{pad}if stem is not None:')
+                lines.append(f'{pad}    return stem')
+            lines.append(f'{pad}return word')
+        
+        emit(self._rev_trie, 0, [], 4)
+        
+        namespace = {'candidate': self._candidate, 'stopwords': self.stopwords}
+        exec(compile('\n'.join(lines), '<nepali_stemmer._fast_stem>', 'exec'), namespace)
+        return namespace['_fast_stem']
+    
+    def _candidate(self, word: str, suffix_len: int, wlen: int) -> Optional[str]:
+        """
+        Strip suffix_len characters from the word and apply sandhi rules.
+        Returns the stem if it passes validation, otherwise None.
+        """
+        stem = self.apply_sandhi_rules(word[:wlen - suffix_len])
+        # The stem is a prefix of the word, so their edit distance is just
+        # the number of characters removed
+        if self.validate_stem(word, stem, wlen - len(stem)):
+            return stem
+        return None
+    
     def load_stopwords(self) -> Set[str]:
         """Load common Nepali stopwords that should not be stemmed."""
         return {
@@ -123,34 +387,17 @@ class NepaliStemmer:
         Calculate minimum edit distance (Levenshtein distance) between two strings.
         Used for validation of stemming operations.
         """
-        m, n = len(s1), len(s2)
-        
-        dp = [[0] * (n + 1) for _ in range(m + 1)]
-        
-        for i in range(m + 1):
-            dp[i][0] = i
-        for j in range(n + 1):
-            dp[0][j] = j
-        
-        for i in range(1, m + 1):
-            for j in range(1, n + 1):
-                if s1[i-1] == s2[j-1]:
-                    dp[i][j] = dp[i-1][j-1]
-                else:
-                    dp[i][j] = 1 + min(
-                        dp[i-1][j],
-                        dp[i][j-1],
-                        dp[i-1][j-1]
-                    )
-        
-        return dp[m][n]
+        return _dist(s1, s2)
     
-    def validate_stem(self, original: str, stem: str) -> bool:
+    def validate_stem(self, original: str, stem: str, distance: Optional[int] = None) -> bool:
         """
         Validate that the stem is reasonable using multiple criteria:
         1. Minimum length check
         2. Edit distance check
         3. Not over-stemmed
+        
+        If the edit distance between original and stem is already known,
+        pass it as distance to skip computing it.
         """
         # Check minimum length
         if len(stem) < self.min_stem_length:
@@ -158,7 +405,10 @@ class NepaliStemmer:
         
         # Check edit distance (stem shouldn't be too different)
         max_distance = int(len(original) * self.edit_distance_threshold)
-        if self.calculate_edit_distance(original, stem) > max_distance:
+        if distance is None:
+            # Only whether the distance exceeds max_distance matters here
+            distance = _bounded_dist(original, stem, max_distance)
+        if distance > max_distance:
             return False
         
         # Stem should not be too short relative to original
@@ -167,33 +417,26 @@ class NepaliStemmer:
         
         return True
     
-    def get_all_suffixes_sorted(self) -> List[Tuple[str, float]]:
+    def get_all_suffixes_sorted(self) -> Tuple[Tuple[str, float, float], ...]:
         """
-        Get all suffixes sorted by priority (frequency * length).
-        Longer, more frequent suffixes are tried first.
+        Get all suffixes as (suffix, weight, score) sorted by priority
+        score (frequency * length). Longer, more frequent suffixes are
+        tried first.
         """
-        all_suffixes = {}
-        
-        # Collect all suffixes with their weights
-        for suffix, weight in self.case_markers.items():
-            all_suffixes[suffix] = weight
-        for suffix, weight in self.plural_markers.items():
-            all_suffixes[suffix] = weight
-        for suffix, weight in self.verbal_suffixes.items():
-            all_suffixes[suffix] = weight
-        for suffix, weight in self.adjectival_suffixes.items():
-            all_suffixes[suffix] = weight
-        for suffix, weight in self.nominal_suffixes.items():
-            all_suffixes[suffix] = weight
-        
-        # Sort by priority: weight * length (prefer longer, weighted suffixes)
-        sorted_suffixes = sorted(
-            all_suffixes.items(),
-            key=lambda x: x[1] * len(x[0]),
-            reverse=True
-        )
-        
-        return sorted_suffixes
+        return self._sorted_suffixes
+    
+    def _matching_ranks(self, word: str) -> List[int]:
+        """Priority ranks of the suffixes the word ends with, best first."""
+        ranks = []
+        node = self._rev_trie
+        for char in reversed(word):
+            node = node.get(char)
+            if node is None:
+                break
+            if '' in node:
+                ranks.append(node[''])
+        ranks.sort()
+        return ranks
     
     def strip_suffix(self, word: str, suffix: str) -> str:
         """Strip a suffix from the word if it ends with it."""
@@ -208,11 +451,11 @@ class NepaliStemmer:
         """
         # Common stem corrections after suffix removal
         
-        # If stem ends with doubled consonant, reduce it
+        # If stem ends with doubled consonant, reduce it. Conjunct doubles
+        # such as 'त्त', 'द्द' and 'न्न' end in virama + consonant, so they
+        # never match here and are kept.
         if len(stem) >= 2 and stem[-1] == stem[-2]:
-            # But keep doubled consonants in common patterns
-            if stem[-1] not in ['त्त', 'द्द', 'न्न']:
-                stem = stem[:-1]
+            stem = stem[:-1]
         
         return stem
     
@@ -228,9 +471,27 @@ class NepaliStemmer:
             Stemmed word
         """
         # Normalize input
-        original_word = word
         word = self.normalize(word)
         
+        return self._stem_normalized_cached(word, apply_validation)
+    
+    def _stem_normalized_cached(self, word: str, apply_validation: bool) -> str:
+        """Stem an already normalized word through the stem cache."""
+        # Validation settings are part of the cache key, since they can be
+        # changed on the instance at any time
+        return self._stem_cached(word, apply_validation,
+                                 self.min_stem_length, self.edit_distance_threshold)
+    
+    def _stem_normalized(self, word: str, apply_validation: bool,
+                         min_stem_length: int, edit_distance_threshold: float) -> str:
+        """
+        Stem an already normalized word. min_stem_length and
+        edit_distance_threshold only key the cache; validate_stem reads
+        the current values from the instance.
+        """
+        if apply_validation:
+            return self._fast_stem(word)
+        
         # Don't stem very short words
         if len(word) <= 2:
             return word
@@ -239,37 +500,40 @@ class NepaliStemmer:
         if word in self.stopwords:
             return word
         
-        # Get sorted suffixes
-        sorted_suffixes = self.get_all_suffixes_sorted()
-        
-        # Try to remove suffixes (greedy approach - remove longest matching first)
-        best_stem = word
-        best_score = 0
-        
-        for suffix, weight in sorted_suffixes:
-            if word.endswith(suffix):
-                potential_stem = self.strip_suffix(word, suffix)
-                
-                # Apply sandhi rules
-                potential_stem = self.apply_sandhi_rules(potential_stem)
-                
-                # Validate the stem
-                if apply_validation:
-                    if self.validate_stem(word, potential_stem):
-                        # Calculate score based on suffix weight and length
-                        score = weight * len(suffix)
-                        if score > best_score:
-                            best_stem = potential_stem
-                            best_score = score
-                else:
-                    # Without validation, take first match
-                    return potential_stem
+        # Without validation, take the highest priority match
+        ranks = self._matching_ranks(word)
+        if ranks:
+            return self.apply_sandhi_rules(word[:-self._suf_lens[ranks[0]]])
         
-        # If no valid suffix found, return original
-        if best_stem == word:
-            return word
+        # If no suffix found, return original
+        return word
+    
+    def stem_many(self, words: Iterable[str]) -> List[str]:
+        """
+        Stem a batch of words (with validation) in one tight loop, with the
+        cached stemmer and normalization bound to locals.
         
-        return best_stem
+        Args:
+            words: Input Nepali words
+            
+        Returns:
+            List of stems, in input order (same as stem() on each word)
+        """
+        return [stem for _, stem in self._stem_many_normalized(words)]
+    
+    def _stem_many_normalized(self, words: Iterable[str]) -> List[Tuple[str, str]]:
+        """
+        Batch stemming that also returns each normalized word, as
+        (normalized word, stem) pairs. The stem is a prefix of the normalized
+        word, so the removed suffix is normalized[len(stem):].
+        """
+        stem_cached = self._stem_normalized_cached
+        normalize = self.normalize
+        results = []
+        for word in words:
+            normalized = normalize(word)
+            results.append((normalized, stem_cached(normalized, True)))
+        return results
     
     def get_suffix_info(self, word: str) -> Dict:
         """
@@ -283,18 +547,19 @@ class NepaliStemmer:
         """
         original_word = word
         word = self.normalize(word)
-        stem = self.stem(word)
+        # Normalize only once: stem() would normalize the word a second time
+        stem = self._stem_normalized_cached(word, True)
         
-        removed_suffix = ""
-        if word != stem:
-            removed_suffix = word[len(stem):]
+        # The stem is always a prefix of the word: the removed part is the
+        # rest, and the edit distance is its length
+        removed_suffix = word[len(stem):]
         
         return {
             'original': original_word,
             'normalized': word,
             'stem': stem,
             'suffix_removed': removed_suffix,
-            'edit_distance': self.calculate_edit_distance(word, stem),
+            'edit_distance': len(removed_suffix),
             'stem_length': len(stem),
             'original_length': len(word)
         }
@@ -364,15 +629,16 @@ def main():
     print("-" * 70)
     print(f"{'Original Word':<25} {'Stem':<20} {'Suffix Removed':<15}")
     print("-" * 70)
-    file=open("output_root.txt", "w", encoding="utf-8")
-    file_suffix=open("output_suffix.txt", "w", encoding="utf-8")
-    for word in test_words:
-        info = stemmer.get_suffix_info(word)
-        print(f"{info['original']:<25} {info['stem']:<20} {info['suffix_removed']:<15}")
-        file.write(f"{info['stem']}\n")
-        file_suffix.write(f"{info['suffix_removed']}\n")
-    file.close()
-    file_suffix.close()
+    results = stemmer._stem_many_normalized(test_words)
+    stems = [stem for _, stem in results]
+    # Stems are prefixes of the normalized words
+    suffixes = [normalized[len(stem):] for normalized, stem in results]
+    for word, stem, suffix in zip(test_words, stems, suffixes):
+        print(f"{word:<25} {stem:<20} {suffix:<15}")
+    with open("output_root.txt", "w", encoding="utf-8") as file:
+        file.writelines(f"{stem}\n" for stem in stems)
+    with open("output_suffix.txt", "w", encoding="utf-8") as file_suffix:
+        file_suffix.writelines(f"{suffix}\n" for suffix in suffixes)
 
     print("Interactive Mode:")
     print("Enter Nepali words to stem (or 'quit' to exit)")